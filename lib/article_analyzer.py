@@ -99,8 +99,16 @@ def propose_mv_images(
         article_title, article_text,
         mv_slot_structure=mv_slot_structure,
     )
-    response_text = gemini.analyze_text(prompt)
 
+    # JSONモードなら正規表現での切り出しが不要で、形式崩れによる再試行も減る
+    try:
+        proposals = json.loads(gemini.analyze_json(prompt))
+        if isinstance(proposals, list):
+            return proposals
+    except Exception:
+        pass  # 旧経路（自由文レスポンスのパース）へフォールバック
+
+    response_text = gemini.analyze_text(prompt)
     proposals = _parse_proposals(response_text)
     return proposals
 
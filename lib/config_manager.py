@@ -130,6 +130,21 @@ class ConfigManager:
         self.storage.save(key, data)
         return key
 
+    def add_reference_images_bulk(self, site_name: str, files: list[tuple[str, bytes]], category: str = "article", preset_id: str | None = None) -> list[str]:
+        """参照画像をまとめて追加し、storage keyのリストを返す。
+
+        書き込みはThreadPoolExecutorで並列化する（Drive等のリモートバックエンドで
+        ファイル数分の直列ラウンドトリップを避ける）。
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _put(item: tuple[str, bytes]) -> str:
+            filename, data = item
+            return self.add_reference_image(site_name, filename, data, category, preset_id)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(_put, files))
+
     def list_reference_images(self, site_name: str, category: str = "article", preset_id: str | None = None) -> list[str]:
         """サイトの参照画像キー一覧を返す（カテゴリ指定、MV時はpreset_id指定可）"""
         # 初回呼び出し時に旧形式のマイグレーションを実行
@@ -141,20 +156,42 @@ class ConfigManager:
         """参照画像のバイナリを読み込む"""
         return self.storage.load(key)
 
+    def open_reference_image(self, key: str):
+        """参照画像を読み込み用ストリームで開く。
+
+        PIL.Image.openは遅延読みするため、ローカルバックエンドでは
+        ファイル全体をbytesへコピーせずにデコードできる。
+        """
+        return self.storage.open(key)
+
     def delete_reference_image(self, key: str) -> None:
         """参照画像を削除"""
         self.storage.delete(key)
 
+    def get_reference_image_bytes(self, site_name: str, category: str = "article", preset_id: str | None = None) -> list[tuple[bytes, str]]:
+        """サイトの参照画像を(バイト列, MIMEタイプ)のリストで返す（最大5枚）。
+
+        PILへのデコードやSDK側の再エンコードを省きたい場合はこちらを使う。
+        """
+        import mimetypes
+        keys = self.list_reference_images(site_name, category, preset_id)
+        results = []
+        for key in keys[:5]:  # 最大5枚制限
+            try:
+                mime = mimetypes.guess_type(key)[0] or "image/png"
+                results.append((self.storage.load(key), mime))
+            except Exception:
+                continue
+        return results
+
     def get_reference_pil_images(self, site_name: str, category: str = "article", preset_id: str | None = None) -> list:
         """サイトの参照画像をPIL Imageのリストで返す（最大5枚）"""
         from PIL import Image
-        import io
         keys = self.list_reference_images(site_name, category, preset_id)
         images = []
         for key in keys[:5]:  # 最大5枚制限
             try:
-                data = self.storage.load(key)
-                img = Image.open(io.BytesIO(data))
+                img = Image.open(self.storage.open(key))
                 images.append(img)
             except Exception:
                 continue
@@ -269,7 +306,6 @@ class ConfigManager:
 
         # 画像 + プロンプトを送信
         contents = [prompt] + images
-        from google.genai import types
         response = gemini_client.client.models.generate_content(
             model="gemini-2.5-flash",
             contents=contents,
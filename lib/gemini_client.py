@@ -5,11 +5,13 @@ Gemini APIラッパー
 
 from __future__ import annotations
 
-from google import genai
-from google.genai import types
 from PIL import Image
 import io
 
+# google-genai SDKはimportが重いため、モジュールトップでは読み込まない。
+# SUPPORTED_* 定数だけを参照するページのrerunでSDK初期化コストを払わないよう、
+# 実際にAPIを呼ぶ箇所で遅延importする（2回目以降はsys.modules参照のみ）。
+
 
 # サポートされるアスペクト比
 SUPPORTED_ASPECT_RATIOS = [
@@ -25,10 +27,26 @@ MODEL_ANALYSIS = "gemini-2.5-flash"
 MODEL_IMAGE = "gemini-3-pro-image-preview"
 
 
+def _to_ref_content(ref):
+    """参照画像をcontents要素へ変換する。
+
+    (バイト列, MIMEタイプ)のタプルはPart.from_bytesでそのまま渡し、
+    SDKによるPIL→PNG再エンコードを省く。PIL Imageは従来どおり。
+    """
+    if isinstance(ref, tuple):
+        from google.genai import types
+
+        data, mime = ref
+        return types.Part.from_bytes(data=data, mime_type=mime)
+    return ref
+
+
 class GeminiClient:
     """Gemini API クライアント"""
 
     def __init__(self, api_key: str):
+        from google import genai
+
         self.client = genai.Client(api_key=api_key)
 
     def analyze_text(
@@ -43,6 +61,27 @@ class GeminiClient:
         )
         return response.text
 
+    def analyze_json(
+        self,
+        prompt: str,
+        model: str = MODEL_ANALYSIS,
+    ) -> str:
+        """JSONモードでのテキスト分析。
+
+        response_mime_typeをapplication/jsonに固定するため、
+        コードブロック除去などの後処理なしでjson.loadsできる文字列が返る。
+        """
+        from google.genai import types
+
+        response = self.client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+            ),
+        )
+        return response.text
+
     def analyze_with_images(
         self,
         prompt: str,
@@ -63,24 +102,27 @@ class GeminiClient:
     def generate_image(
         self,
         prompt: str,
-        reference_images: list[Image.Image] | None = None,
+        reference_images: list[Image.Image | tuple[bytes, str]] | None = None,
         aspect_ratio: str = "16:9",
         image_size: str = "2K",
         model: str = MODEL_IMAGE,
     ) -> tuple[Image.Image | None, str | None]:
         """
         画像を生成する。
-        参照画像（スタイルトランスファー用）はPIL Imageのリストで渡す。
+        参照画像（スタイルトランスファー用）はPIL Imageまたは
+        (バイト列, MIMEタイプ)タプルのリストで渡す。
 
         Returns:
             (生成画像, レスポンステキスト) のタプル
         """
+        from google.genai import types
+
         # 参照画像 → プロンプトの順でcontentsを組み立て
         # （参照画像を先に見せてからテキスト指示を与えることでスタイル模倣が効きやすくなる）
         contents: list = []
         if reference_images:
             for ref_img in reference_images:
-                contents.append(ref_img)
+                contents.append(_to_ref_content(ref_img))
         contents.append(prompt)
 
         # アスペクト比とサイズのバリデーション
@@ -111,6 +153,9 @@ class GeminiClient:
                     genai_img = part.as_image()
                     # genai.types.Image → PIL.Image に変換
                     generated_image = Image.open(io.BytesIO(genai_img.image_bytes))
+                    # 元のエンコード済みバイト列を添付（表示・保存時の再エンコードを省ける）
+                    generated_image.raw_bytes = genai_img.image_bytes
+                    generated_image.raw_mime = part.inline_data.mime_type or "image/png"
 
         return generated_image, response_text
 
@@ -143,17 +188,19 @@ class GeminiClient:
         self,
         current_image: Image.Image,
         instruction: str,
-        reference_images: list[Image.Image] | None = None,
+        reference_images: list[Image.Image | tuple[bytes, str]] | None = None,
         model: str = MODEL_IMAGE,
     ) -> tuple[Image.Image | None, str | None]:
         """
         既存の画像に対して微修正を加えて再生成する。アスペクト比は元画像を維持。
         instruction は呼び出し側で完成させた指示文（boilerplate含む）を渡すこと。
         """
+        from google.genai import types
+
         contents: list = []
         if reference_images:
             for ref_img in reference_images:
-                contents.append(ref_img)
+                contents.append(_to_ref_content(ref_img))
         contents.append(current_image)
         contents.append(instruction)
 
@@ -175,5 +222,7 @@ class GeminiClient:
                 elif part.inline_data is not None:
                     genai_img = part.as_image()
                     gen_image = Image.open(io.BytesIO(genai_img.image_bytes))
+                    gen_image.raw_bytes = genai_img.image_bytes
+                    gen_image.raw_mime = part.inline_data.mime_type or "image/png"
 
         return gen_image, gen_text
@@ -19,7 +19,7 @@ def trim_whitespace(image: Image.Image, threshold: int = 245, padding: int = 10)
         threshold: この値以上のRGB値を「白」と判定（0-255）
         padding: トリミング後に残すパディング（px）
     """
-    img_array = np.array(image.convert("RGB"))
+    img_array = np.asarray(image.convert("RGB"))
     mask = np.any(img_array < threshold, axis=2)
 
     rows = np.any(mask, axis=1)
@@ -28,8 +28,12 @@ def trim_whitespace(image: Image.Image, threshold: int = 245, padding: int = 10)
     if not rows.any() or not cols.any():
         return image
 
-    rmin, rmax = np.where(rows)[0][[0, -1]]
-    cmin, cmax = np.where(cols)[0][[0, -1]]
+    # argmaxは最初のTrueで確定するため、np.whereのように
+    # インデックス配列を丸ごと作らずに両端だけを求められる
+    rmin = int(np.argmax(rows))
+    rmax = len(rows) - 1 - int(np.argmax(rows[::-1]))
+    cmin = int(np.argmax(cols))
+    cmax = len(cols) - 1 - int(np.argmax(cols[::-1]))
 
     # パディング追加
     h, w = img_array.shape[:2]
@@ -43,17 +47,37 @@ def trim_whitespace(image: Image.Image, threshold: int = 245, padding: int = 10)
 
 def resize_to_target(image: Image.Image, width: int, height: int) -> Image.Image:
     """指定サイズにリサイズ（アスペクト比維持、余白は背景色で埋める）"""
-    img = image.copy()
-    img.thumbnail((width, height), Image.LANCZOS)
+    # 縮小後サイズを先に計算してresize一発にすることで、
+    # thumbnail用のフルサイズcopyを作らない（thumbnail同様、拡大はしない）
+    scale = min(width / image.width, height / image.height, 1.0)
+    new_w = max(1, round(image.width * scale))
+    new_h = max(1, round(image.height * scale))
+
+    if (new_w, new_h) == image.size:
+        img = image
+    else:
+        img = image.resize((new_w, new_h), Image.LANCZOS)
+
+    # ぴったり収まるならキャンバス合成も省略する
+    if (new_w, new_h) == (width, height):
+        return img.convert("RGB") if img.mode != "RGB" else (img.copy() if img is image else img)
 
     # キャンバス作成（白背景）
     canvas = Image.new("RGB", (width, height), (255, 255, 255))
-    x = (width - img.width) // 2
-    y = (height - img.height) // 2
+    x = (width - new_w) // 2
+    y = (height - new_h) // 2
     canvas.paste(img, (x, y))
     return canvas
 
 
+def trim_and_resize(image: Image.Image, width: int, height: int) -> Image.Image:
+    """余白トリミング→リサイズをメモリ上で連結して1パスで行う。
+
+    個別にボタンを押した場合の中間PNGエンコード/デコードを挟まない分速い。
+    """
+    return resize_to_target(trim_whitespace(image), width, height)
+
+
 def add_title_overlay(
     image: Image.Image,
     title_text: str,
@@ -162,10 +186,20 @@ def add_logo(
     return base.convert("RGB")
 
 
-def image_to_bytes(image: Image.Image, format: str = "PNG") -> bytes:
-    """PIL Image → bytes変換"""
+def image_to_bytes(
+    image: Image.Image, format: str = "PNG", compress_level: int | None = None
+) -> bytes:
+    """PIL Image → bytes変換。
+
+    compress_levelはPNG時のzlibレベル（未指定ならPILデフォルトの6）。
+    プレビュー等の中間エンコードには1を指定すると数倍速い（サイズは2割増程度）。
+    保存・ダウンロード用途はデフォルトのままにすること。
+    """
     buf = io.BytesIO()
-    image.save(buf, format=format)
+    if format.upper() == "PNG" and compress_level is not None:
+        image.save(buf, format=format, compress_level=compress_level)
+    else:
+        image.save(buf, format=format)
     return buf.getvalue()
 
 
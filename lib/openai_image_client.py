@@ -57,6 +57,16 @@ def _to_openai_quality(image_size: str) -> str:
 _OPENAI_MAX_REF_DIMENSION = 1800
 
 
+def _ensure_pil(ref) -> Image.Image:
+    """(バイト列, MIMEタイプ)タプルで渡された参照画像をPILへ戻す。
+
+    OpenAI側は縮小・PNG化が必要なためバイト列のままでは送れない。
+    """
+    if isinstance(ref, tuple):
+        return Image.open(io.BytesIO(ref[0]))
+    return ref
+
+
 def _shrink_for_openai(img: Image.Image, max_dim: int = _OPENAI_MAX_REF_DIMENSION) -> Image.Image:
     """参照画像が長辺max_dimを超える場合のみアスペクト比維持で縮小して返す。"""
     w, h = img.size
@@ -99,7 +109,7 @@ class OpenAIImageClient:
             # 参照画像あり → images.edit でスタイルトランスファー
             image_files = []
             for i, ref_img in enumerate(reference_images):
-                shrunk = _shrink_for_openai(ref_img)
+                shrunk = _shrink_for_openai(_ensure_pil(ref_img))
                 buf = io.BytesIO()
                 shrunk.save(buf, format="PNG")
                 buf.seek(0)
@@ -135,6 +145,9 @@ class OpenAIImageClient:
 
         image_bytes = base64.b64decode(b64)
         generated_image = Image.open(io.BytesIO(image_bytes))
+        # 元のエンコード済みバイト列を添付（表示・保存時の再エンコードを省ける）
+        generated_image.raw_bytes = image_bytes
+        generated_image.raw_mime = "image/png"
         revised_prompt = getattr(item, "revised_prompt", None)
 
         return generated_image, revised_prompt
@@ -186,7 +199,7 @@ class OpenAIImageClient:
         image_files = []
         all_images = (reference_images or []) + [current_image]
         for i, img in enumerate(all_images):
-            shrunk = _shrink_for_openai(img)
+            shrunk = _shrink_for_openai(_ensure_pil(img))
             buf = io.BytesIO()
             shrunk.save(buf, format="PNG")
             buf.seek(0)
@@ -208,5 +221,8 @@ class OpenAIImageClient:
         b64 = getattr(item, "b64_json", None)
         if not b64:
             return None, getattr(item, "revised_prompt", None)
-        gen_image = Image.open(io.BytesIO(base64.b64decode(b64)))
+        image_bytes = base64.b64decode(b64)
+        gen_image = Image.open(io.BytesIO(image_bytes))
+        gen_image.raw_bytes = image_bytes
+        gen_image.raw_mime = "image/png"
         return gen_image, getattr(item, "revised_prompt", None)
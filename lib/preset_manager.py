@@ -168,6 +168,17 @@ class PresetManager:
         self.storage.save(key, data)
         return key
 
+    def upload_images_bulk(self, category_type: str, category_id: str, files: list[tuple[str, bytes]]) -> list[str]:
+        """プリセット画像をまとめてアップロードし、keyのリストを返す（書き込みは並列）"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _put(item: tuple[str, bytes]) -> str:
+            filename, data = item
+            return self.upload_image(category_type, category_id, filename, data)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(_put, files))
+
     def delete_image(self, key: str) -> None:
         """プリセット画像を削除"""
         self.storage.delete(key)
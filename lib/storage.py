@@ -9,6 +9,7 @@ from __future__ import annotations
 import io
 import json
 import os
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
 import shutil
@@ -52,6 +53,14 @@ class StorageBackend(ABC):
         """キーを削除"""
         ...
 
+    def open(self, key: str) -> io.BufferedIOBase:
+        """キーを読み込み用ストリームで開く。
+
+        デフォルト実装は全読みしたbytesをBytesIOで包む。
+        ローカル等、ストリームを直接返せるバックエンドはオーバーライドする。
+        """
+        return io.BytesIO(self.load(key))
+
 
 class LocalStorage(StorageBackend):
     """ローカルファイルシステムベースのストレージ"""
@@ -114,6 +123,13 @@ class LocalStorage(StorageBackend):
         elif path.is_dir():
             shutil.rmtree(path)
 
+    def open(self, key: str) -> io.BufferedIOBase:
+        """ファイルハンドルをそのまま返す（bytesへの全読みコピーを避ける）"""
+        path = self._resolve(key)
+        if not path.exists():
+            raise FileNotFoundError(f"Key not found: {key}")
+        return path.open("rb")
+
     def get_absolute_path(self, key: str) -> Path:
         """ローカル固有: 絶対パスを返す（Pillow等に渡す用）"""
         return self._resolve(key)
@@ -153,6 +169,9 @@ class GoogleDriveStorage(StorageBackend):
         self.root_folder_id = folder_id
         # フォルダIDキャッシュ: パス文字列 → Drive folder ID
         self._folder_cache: dict[str, str] = {"": self.root_folder_id}
+        # Driveは同名兄弟フォルダを許すため、並列save時にquery→createが
+        # 競合すると重複フォルダができてしまう。解決/作成は直列化する
+        self._folder_lock = threading.Lock()
 
     # --- 内部ヘルパー: requests で Drive API v3 を直接叩く ---
 
@@ -190,7 +209,15 @@ class GoogleDriveStorage(StorageBackend):
         return self._api_get("files", params)
 
     def _get_or_create_folder(self, folder_path: str) -> str:
-        """パス文字列に対応するDriveフォルダIDを取得or作成"""
+        """パス文字列に対応するDriveフォルダIDを取得or作成（スレッドセーフ）"""
+        if folder_path in self._folder_cache:
+            return self._folder_cache[folder_path]
+
+        with self._folder_lock:
+            return self._get_or_create_folder_locked(folder_path)
+
+    def _get_or_create_folder_locked(self, folder_path: str) -> str:
+        # ロック取得待ちの間に他スレッドが作成済みの場合がある
         if folder_path in self._folder_cache:
             return self._folder_cache[folder_path]
 
@@ -24,12 +24,48 @@ from lib.image_postprocessor import (
     image_to_bytes,
 )
 
+# selectboxの初期選択。定数なのでrerunごとに線形探索しない
+_DEFAULT_AR_IDX = SUPPORTED_ASPECT_RATIOS.index("16:9")
+_DEFAULT_SIZE_IDX = SUPPORTED_IMAGE_SIZES.index("2K")
+
+# レイアウトタイプ別のアイコン（rerun×案数ぶんのdict構築を避ける）
+_LAYOUT_ICONS = {
+    "分類型": "📊", "比較型": "⚖️", "フロー型": "➡️",
+    "ピラミッド型": "🔺", "アイコン軽量型": "💡",
+}
+
+
+@st.cache_data(show_spinner=False)
+def _preview_bytes(img_bytes: bytes, max_side: int = 800) -> bytes:
+    """画面プレビュー用の縮小JPEG。表示列は~600pxなのでフル解像度を送らない"""
+    im = Image.open(io.BytesIO(img_bytes))
+    im.thumbnail((max_side, max_side), Image.LANCZOS)
+    buf = io.BytesIO()
+    im.convert("RGB").save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
 
 def get_pm():
     from lib.dependencies import get_preset_manager
     return get_preset_manager()
 
 
+@st.cache_resource(show_spinner=False)
+def _get_gemini_client(api_key: str) -> GeminiClient:
+    """記事分析用クライアント。rerunごとに作り直さず接続を使い回す"""
+    return GeminiClient(api_key=api_key)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_image_client_cached(provider: str, gemini_api_key: str, openai_api_key: str):
+    """画像生成クライアント。キーとプロバイダが同じ間は同一インスタンスを返す"""
+    return get_image_client(
+        provider=provider,
+        gemini_api_key=gemini_api_key,
+        openai_api_key=openai_api_key,
+    )
+
+
 def get_cm():
     from lib.dependencies import get_config_manager
     return get_config_manager()
@@ -50,10 +86,10 @@ def _save_to_storage(image, site_name: str, label: str, category: str = "article
 
 def refine_image(entry_index, refinement_text, config, site_name=None):
     """生成済み画像に微修正を加えて再生成する"""
-    image_client = get_image_client(
-        provider=st.session_state.image_provider,
-        gemini_api_key=st.session_state.api_key,
-        openai_api_key=st.session_state.openai_api_key,
+    image_client = _get_image_client_cached(
+        st.session_state.image_provider,
+        st.session_state.api_key,
+        st.session_state.openai_api_key,
     )
     entry = st.session_state.generated_images[entry_index]
     current_img = entry.get("processed_image") or entry["image"]
@@ -87,12 +123,12 @@ def refine_image(entry_index, refinement_text, config, site_name=None):
 def generate_single_image(proposal, idx, config, pm, aspect_ratio, image_size, taste_id, article_text, site_name=None):
     """1案分の画像を生成して session_state.generated_images に追加する"""
     # 記事分析(auto_select_taste等)用の Gemini クライアント (常時 Gemini Flash)
-    gemini = GeminiClient(api_key=st.session_state.api_key)
+    gemini = _get_gemini_client(st.session_state.api_key)
     # 画像生成用のクライアント (プロバイダ選択に応じて Gemini or OpenAI)
-    image_client = get_image_client(
-        provider=st.session_state.image_provider,
-        gemini_api_key=st.session_state.api_key,
-        openai_api_key=st.session_state.openai_api_key,
+    image_client = _get_image_client_cached(
+        st.session_state.image_provider,
+        st.session_state.api_key,
+        st.session_state.openai_api_key,
     )
     design_system = render_design_system(config)
 
@@ -198,22 +234,23 @@ st.info(f"対象サイト: **{config.get('brand_name', st.session_state.current_
 # =============================================
 st.subheader("Step 1: 記事テキストを入力")
 
+# ウィジェットのkeyに共有キーを直接束縛し、rerunごとの二重書き込みをなくす。
+# key直結の状態はページ遷移で破棄されるため、自己代入で保持しておく
+st.session_state.article_title = st.session_state.article_title
+st.session_state.article_text = st.session_state.article_text
+
 article_title = st.text_input(
     "記事タイトル",
-    value=st.session_state.article_title,
     placeholder="例: 看護師のパワハラ対策完全ガイド",
-    key="input_article_title",
+    key="article_title",
 )
-st.session_state.article_title = article_title
 
 article_text = st.text_area(
     "記事本文（Markdown or HTML）",
-    value=st.session_state.article_text,
     height=300,
     placeholder="記事の本文をここに貼り付けてください...\n## 見出し2\n### 見出し3\nなどのH2/H3構造を含む形式がベストです。",
-    key="input_article_text",
+    key="article_text",
 )
-st.session_state.article_text = article_text
 
 # =============================================
 # Step 2: 記事分析
@@ -249,7 +286,7 @@ if btn_analyze and article_text.strip():
 
             # Geminiで画像案を生成
             st.write("Gemini APIで画像案を生成中...")
-            gemini = GeminiClient(api_key=st.session_state.api_key)
+            gemini = _get_gemini_client(st.session_state.api_key)
             proposals = propose_images(article_text, config, gemini)
 
             if proposals:
@@ -274,10 +311,7 @@ if st.session_state.proposals:
     # ----- Step 3: 画像案の一覧（選択のみ。編集は下のexpander） -----
     st.subheader("Step 3: 画像案を選択")
     for i, proposal in enumerate(proposals):
-        layout_icon = {
-            "分類型": "📊", "比較型": "⚖️", "フロー型": "➡️",
-            "ピラミッド型": "🔺", "アイコン軽量型": "💡",
-        }.get(proposal.get("layout_type", ""), "📋")
+        layout_icon = _LAYOUT_ICONS.get(proposal.get("layout_type", ""), "📋")
 
         rec_ar = proposal.get("recommended_aspect_ratio", "")
         ar_label = f" [{rec_ar}]" if rec_ar else ""
@@ -298,7 +332,7 @@ if st.session_state.proposals:
         aspect_ratio = st.selectbox(
             "アスペクト比",
             SUPPORTED_ASPECT_RATIOS,
-            index=SUPPORTED_ASPECT_RATIOS.index("16:9"),
+            index=_DEFAULT_AR_IDX,
             key="gen_aspect_ratio",
         )
 
@@ -306,7 +340,7 @@ if st.session_state.proposals:
         image_size = st.selectbox(
             "画像解像度",
             SUPPORTED_IMAGE_SIZES,
-            index=SUPPORTED_IMAGE_SIZES.index("2K"),
+            index=_DEFAULT_SIZE_IDX,
             key="gen_image_size",
         )
 
@@ -500,7 +534,13 @@ if st.session_state.generated_images:
 
         with display_col:
             display_img = processed if processed else img
-            st.image(display_img, width="stretch")
+            # プレビューは縮小版を送る（フル解像度はダウンロード時のみ）。
+            # 未加工ならAPIが返したエンコード済みバイト列をそのまま使い、
+            # rerunごとのフル解像度PNGエンコードを省く
+            src = None if processed else getattr(img, "raw_bytes", None)
+            if src is None:
+                src = image_to_bytes(display_img, compress_level=1)
+            st.image(_preview_bytes(src), width="stretch")
 
         with control_col:
             # --- 微修正 ---
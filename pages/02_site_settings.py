@@ -3,8 +3,19 @@
 サイトの登録・デザインシステム・カラーパレット・画像サイズを管理する。
 """
 
+import io
+import json
 import os
+import traceback
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 import streamlit as st
+from PIL import Image as PILImage
+
 from lib.color_extractor import extract_colors_from_url
 from lib.prompt_templates import render_design_system, MV_DESIGN_SPEC_DEFAULT
 
@@ -14,6 +25,58 @@ def get_cm():
     return get_config_manager()
 
 
+# スウォッチ表示用のラベルとconfigキーの対応（rerunごとに組み立てない）
+_LABELS_KEYS = list(zip(
+    ["Primary", "Secondary", "Accent", "Background", "Text"],
+    ["primary", "secondary", "accent", "background", "text"],
+))
+
+
+@st.cache_data(show_spinner=False)
+def _pretty_slot_json(slot_structure: dict) -> str:
+    """スロット構造の整形JSON（rerunごとの再シリアライズを避ける）"""
+    if orjson is not None:
+        return orjson.dumps(slot_structure, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(slot_structure, ensure_ascii=False, indent=2)
+
+
+def _parse_slot_json(text: str) -> dict:
+    """スロット構造JSONのパース（orjsonがあれば高速パスを使う）"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@st.cache_data(show_spinner=False)
+def _design_system_preview(config: dict) -> str:
+    """デザインシステムプロンプトのプレビュー（config不変なら再レンダしない）
+
+    expander本体は折りたたみ中もrerunごとに実行されるため、
+    テンプレートレンダリングを内容ベースでキャッシュする。
+    """
+    return render_design_system(config)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_thumb(ref_key: str) -> bytes:
+    """参照画像のサムネイルbytes（WebP・長辺256px）を返す。
+
+    一覧表示はサムネイルで足りるので、フル解像度のPIL Imageを
+    rerunごとにwebsocketへ流さない。
+    """
+    img = PILImage.open(get_cm().open_reference_image(ref_key))
+    img.thumbnail((256, 256), PILImage.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=70)
+    return buf.getvalue()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_extract_colors(url: str) -> dict:
+    """同一URLのカラー抽出結果を1時間キャッシュ（ネットワーク+CSS解析が重い）"""
+    return extract_colors_from_url(url)
+
+
 def get_gemini_client():
     """GeminiClientを取得（参照画像分析用）"""
     from lib.gemini_client import GeminiClient
@@ -23,6 +86,19 @@ def get_gemini_client():
     return GeminiClient(api_key=api_key)
 
 
+def _mark_dirty():
+    """configの変更を記録する。実際の保存は_flush_if_dirtyでrerunあたり1回に集約"""
+    st.session_state._config_dirty = True
+
+
+def _flush_if_dirty(cm, site_name, config):
+    """未保存の変更があればconfigを1回だけ保存する"""
+    if st.session_state.get("_config_dirty"):
+        cm.save(site_name, config)
+        st.session_state.site_config = config
+        st.session_state._config_dirty = False
+
+
 def run_ref_image_analysis(cm, site_name, config, category="article"):
     """参照画像をGeminiで分析してデザイン特徴を抽出し、設定に反映する"""
     gc = get_gemini_client()
@@ -38,8 +114,7 @@ def run_ref_image_analysis(cm, site_name, config, category="article"):
             analysis = cm.analyze_reference_images(site_name, gc, category=category)
             if analysis:
                 config[config_key] = analysis
-                cm.save(site_name, config)
-                st.session_state.site_config = config
+                _mark_dirty()
                 st.session_state[f"show_{category}_analysis_result"] = True
                 st.success(f"{label}の参照画像分析が完了しました。")
             else:
@@ -55,6 +130,16 @@ def run_ref_image_analysis(cm, site_name, config, category="article"):
 # =============================================
 st.title("サイト設定")
 
+# このページで使うsession_stateキーを一括初期化（各所のin/getチェックを不要にする）
+_PAGE_STATE_DEFAULTS = {
+    "confirm_delete_site": False,
+    "extracted_colors": None,
+    "extracted_url": "",
+    "mv_preset_select_idx": 0,
+}
+for _key, _default in _PAGE_STATE_DEFAULTS.items():
+    st.session_state.setdefault(_key, _default)
+
 cm = get_cm()
 sites = cm.list_sites()
 
@@ -103,7 +188,17 @@ with tab_edit:
         st.stop()
 
     site_name = st.session_state.current_site
-    config = st.session_state.site_config.copy()
+
+    # 編集バッファ: rerunごとに全dictをコピーせず、サイト切替時のみ作り直す
+    # （ref_image_analysis等の分析blobを含むconfigはキー入力のたびのコピーが重い）
+    if st.session_state.get("_last_site") != site_name:
+        st.session_state.site_config_edit = dict(st.session_state.site_config)
+        st.session_state._last_site = site_name
+        st.session_state._config_dirty = False
+    config = st.session_state.site_config_edit
+
+    # 前rerunで_mark_dirtyされた未保存の変更をここでまとめて保存する
+    _flush_if_dirty(cm, site_name, config)
 
     st.subheader(f"サイト: {config.get('brand_name', site_name)}")
 
@@ -124,7 +219,7 @@ with tab_edit:
             else:
                 with st.spinner("CSSを解析中..."):
                     try:
-                        result = extract_colors_from_url(url_input)
+                        result = _cached_extract_colors(url_input)
                         st.session_state.extracted_colors = result
                         st.session_state.extracted_url = url_input
                         st.rerun()
@@ -132,47 +227,43 @@ with tab_edit:
                         st.error(f"カラー抽出に失敗しました: {e}")
 
         # 抽出結果の表示（session_stateに保持）
-        if "extracted_colors" in st.session_state:
+        if st.session_state.extracted_colors is not None:
             result = st.session_state.extracted_colors
             suggested = result["suggested"]
 
             st.success("カラーパレットを抽出しました。")
 
             st.markdown("**抽出されたカラー候補:**")
-            cols = st.columns(5)
-            labels = ["Primary", "Secondary", "Accent", "Background", "Text"]
-            keys = ["primary", "secondary", "accent", "background", "text"]
-            for i, (label, key) in enumerate(zip(labels, keys)):
-                with cols[i]:
-                    color = suggested[key]
-                    st.markdown(
-                        f'<div style="background:{color};width:60px;height:60px;'
-                        f'border-radius:8px;border:1px solid #ddd;"></div>',
-                        unsafe_allow_html=True,
-                    )
-                    st.caption(f"{label}\n{color}")
+            # カラム×(markdown+caption)のウィジェット群は1回のst.markdownにまとめる
+            swatch_html = "".join(
+                f'<div style="display:inline-flex;flex-direction:column;align-items:center;'
+                f'margin-right:16px;font-size:12px;color:#666;">'
+                f'<div style="background:{suggested[key]};width:60px;height:60px;'
+                f'border-radius:8px;border:1px solid #ddd;"></div>'
+                f'{label}<br>{suggested[key]}</div>'
+                for label, key in _LABELS_KEYS
+            )
+            st.markdown(swatch_html, unsafe_allow_html=True)
 
             if result["all_colors"]:
                 st.markdown("**検出された全カラー（上位20色）:**")
-                color_html_parts = []
-                for c in result["all_colors"][:20]:
-                    color_html_parts.append(
-                        f'<span style="display:inline-block;width:28px;height:28px;'
-                        f'background:{c["hex"]};border:1px solid #ddd;border-radius:4px;'
-                        f'margin:2px;" title="{c["hex"]} ({c["count"]}回)"></span>'
-                    )
-                st.markdown(" ".join(color_html_parts), unsafe_allow_html=True)
+                color_html = "".join(
+                    f'<span style="display:inline-block;width:28px;height:28px;'
+                    f'background:{c["hex"]};border:1px solid #ddd;border-radius:4px;'
+                    f'margin:2px;" title="{c["hex"]} ({c["count"]}回)"></span>'
+                    for c in result["all_colors"][:20]
+                )
+                st.markdown(color_html, unsafe_allow_html=True)
 
             if st.button("この配色を適用", key="btn_apply_colors"):
-                config["site_url"] = st.session_state.get("extracted_url", url_input)
+                config["site_url"] = st.session_state.extracted_url or url_input
                 config["primary_color"] = suggested["primary"]
                 config["secondary_color"] = suggested["secondary"]
                 config["accent_color"] = suggested["accent"]
                 config["background_color"] = suggested["background"]
                 config["text_color"] = suggested["text"]
-                cm.save(site_name, config)
-                st.session_state.site_config = config
-                del st.session_state.extracted_colors
+                _mark_dirty()
+                st.session_state.extracted_colors = None
                 st.rerun()
 
     # =============================================
@@ -293,19 +384,14 @@ with tab_edit:
             for ri, rk in enumerate(ref_keys):
                 with ref_cols[ri % 5]:
                     try:
-                        from PIL import Image as PILImage
-                        import io as _io
-                        ref_data = cm.load_reference_image(rk)
-                        ref_img = PILImage.open(_io.BytesIO(ref_data))
-                        st.image(ref_img, width="stretch")
+                        st.image(_load_thumb(rk), width="stretch")
                         fname = rk.split("/")[-1]
                         st.caption(fname)
                         if st.button("🗑", key=f"del_ref_article_{ri}"):
                             cm.delete_reference_image(rk)
                             if config_key in config:
                                 del config[config_key]
-                                cm.save(site_name, config)
-                                st.session_state.site_config = config
+                                _mark_dirty()
                             st.rerun()
                     except Exception:
                         st.warning(f"読込失敗: {rk}")
@@ -324,24 +410,18 @@ with tab_edit:
                 key="upload_ref_images_article",
             )
             if uploaded_refs:
-                added = 0
-                for uf in uploaded_refs:
-                    if len(ref_keys) + added >= 5:
-                        st.warning("最大5枚まで登録できます。")
-                        break
-                    cm.add_reference_image(site_name, uf.name, uf.getvalue(), category="article")
-                    added += 1
-                if added > 0:
-                    st.success(f"{added}枚アップロードしました。")
-                    st.session_state["trigger_ref_analysis_article"] = True
+                capacity = 5 - len(ref_keys)
+                if len(uploaded_refs) > capacity:
+                    st.warning("最大5枚まで登録できます。")
+                files = [(uf.name, uf.getvalue()) for uf in uploaded_refs[:capacity]]
+                if files:
+                    cm.add_reference_images_bulk(site_name, files, category="article")
+                    st.success(f"{len(files)}枚アップロードしました。")
+                    st.info("アップロード完了。「🔍 再分析」ボタンを押すと分析します。")
                     st.rerun()
         else:
             st.info("上限の5枚に達しています。削除してから追加してください。")
 
-        if st.session_state.get("trigger_ref_analysis_article", False):
-            del st.session_state["trigger_ref_analysis_article"]
-            config = run_ref_image_analysis(cm, site_name, config, category="article")
-
         existing_analysis = config.get(config_key, "")
         if existing_analysis:
             show_key = "show_article_analysis_result"
@@ -365,8 +445,6 @@ with tab_edit:
     # MV（アイキャッチ）用タブ — プリセット対応
     # =============================================
     with ref_tab_mv:
-        import json as _json
-
         # --- プリセット管理 ---
         mv_presets = config.get("mv_presets", [])
 
@@ -378,8 +456,6 @@ with tab_edit:
         preset_options.append("＋ 新規プリセット作成")
 
         # セッションステートでプリセット選択を管理
-        if "mv_preset_select_idx" not in st.session_state:
-            st.session_state.mv_preset_select_idx = 0
 
         selected_preset_label = st.selectbox(
             "MVプリセット",
@@ -459,8 +535,7 @@ with tab_edit:
                             )
                         except Exception:
                             pass
-                    cm.save(site_name, config)
-                    st.session_state.site_config = config
+                    _mark_dirty()
                     st.session_state.mv_preset_select_idx = 0
                     st.success("既存設定を「デフォルト」プリセットに移行しました。")
                     st.rerun()
@@ -476,8 +551,7 @@ with tab_edit:
                 if st.button("🗑 このプリセットを削除", key="btn_delete_mv_preset"):
                     mv_presets.pop(selected_preset_idx)
                     config["mv_presets"] = mv_presets
-                    cm.save(site_name, config)
-                    st.session_state.site_config = config
+                    _mark_dirty()
                     st.session_state.mv_preset_select_idx = 0
                     st.rerun()
 
@@ -492,11 +566,7 @@ with tab_edit:
                 for ri, rk in enumerate(ref_keys):
                     with ref_cols[ri % 5]:
                         try:
-                            from PIL import Image as PILImage
-                            import io as _io
-                            ref_data = cm.load_reference_image(rk)
-                            ref_img = PILImage.open(_io.BytesIO(ref_data))
-                            st.image(ref_img, width="stretch")
+                            st.image(_load_thumb(rk), width="stretch")
                             fname = rk.split("/")[-1]
                             st.caption(fname)
                             if st.button("🗑", key=f"del_ref_mv_preset_{preset_id}_{ri}"):
@@ -504,8 +574,7 @@ with tab_edit:
                                 # プリセット内の分析結果もクリア
                                 preset["mv_ref_image_analysis"] = ""
                                 config["mv_presets"] = mv_presets
-                                cm.save(site_name, config)
-                                st.session_state.site_config = config
+                                _mark_dirty()
                                 st.rerun()
                         except Exception:
                             st.warning(f"読込失敗: {rk}")
@@ -526,8 +595,7 @@ with tab_edit:
                                     if analysis:
                                         preset["mv_ref_image_analysis"] = analysis
                                         config["mv_presets"] = mv_presets
-                                        cm.save(site_name, config)
-                                        st.session_state.site_config = config
+                                        _mark_dirty()
                                         st.success("分析が完了しました。")
                                     else:
                                         st.warning("分析結果を取得できませんでした。")
@@ -552,14 +620,12 @@ with tab_edit:
                                     if slot_structure and "slots" in slot_structure:
                                         preset["mv_slot_structure"] = slot_structure
                                         config["mv_presets"] = mv_presets
-                                        cm.save(site_name, config)
-                                        st.session_state.site_config = config
+                                        _mark_dirty()
                                         st.success(f"スロット構造を検出: {len(slot_structure['slots'])}スロット")
                                         _slot_detect_success = True
                                     else:
                                         st.error("スロット構造の検出に失敗しました。")
                             except Exception as e:
-                                import traceback
                                 st.error(f"検出エラー: {e}")
                                 st.code(traceback.format_exc())
                         if _slot_detect_success:
@@ -576,81 +642,63 @@ with tab_edit:
                     key=f"upload_ref_mv_preset_{preset_id}",
                 )
                 if uploaded_refs:
-                    added = 0
-                    for uf in uploaded_refs:
-                        if len(ref_keys) + added >= 5:
-                            st.warning("最大5枚まで登録できます。")
-                            break
-                        cm.add_reference_image(
-                            site_name, uf.name, uf.getvalue(),
+                    capacity = 5 - len(ref_keys)
+                    if len(uploaded_refs) > capacity:
+                        st.warning("最大5枚まで登録できます。")
+                    files = [(uf.name, uf.getvalue()) for uf in uploaded_refs[:capacity]]
+                    if files:
+                        cm.add_reference_images_bulk(
+                            site_name, files,
                             category="mv", preset_id=preset_id,
                         )
-                        added += 1
-                    if added > 0:
-                        st.success(f"{added}枚アップロードしました。")
-                        # 自動分析トリガー
-                        st.session_state[f"trigger_ref_analysis_mv_preset_{preset_id}"] = True
+                        st.success(f"{len(files)}枚アップロードしました。")
+                        st.info("アップロード完了。「🔍 参照画像を再分析」ボタンを押すと分析します。")
                         st.rerun()
             else:
                 st.info("上限の5枚に達しています。削除してから追加してください。")
 
-            # アップロード後の自動分析
-            trigger_key = f"trigger_ref_analysis_mv_preset_{preset_id}"
-            if st.session_state.get(trigger_key, False):
-                del st.session_state[trigger_key]
-                gc = get_gemini_client()
-                if gc:
-                    with st.spinner("MV参照画像を分析中..."):
-                        try:
-                            analysis = cm.analyze_reference_images(
-                                site_name, gc, category="mv", preset_id=preset_id
+            # スロット構造の表示・編集
+            preset_slot = preset.get("mv_slot_structure", {})
+            if preset_slot and preset_slot.get("slots"):
+                with st.expander("検出済みスロット構造", expanded=False):
+                    # expander本体は折りたたみ中もrerunごとに実行されるため、
+                    # 重い編集UIはチェックボックスをONにしたときだけ構築する
+                    if st.checkbox("スロット構造を編集", key=f"show_slot_editor_{preset_id}"):
+                        for s in preset_slot.get("slots", []):
+                            st.markdown(f"- **{s['role']}**: {s.get('description', '')}")
+                        absent = preset_slot.get("absent_slots", [])
+                        if absent:
+                            st.caption(f"不在スロット: {', '.join(absent)}")
+                        if preset_slot.get("person_style"):
+                            st.caption(f"人物: {preset_slot['person_style']}")
+                        if preset_slot.get("background_summary"):
+                            st.caption(f"背景: {preset_slot['background_summary']}")
+
+                        # formで囲み、編集途中のキー入力でページ全体がrerunされないようにする
+                        with st.form(f"slot_json_form_{preset_id}"):
+                            edited_json = st.text_area(
+                                "JSON編集（手動修正）",
+                                value=_pretty_slot_json(preset_slot),
+                                height=200,
+                                key=f"edit_slot_structure_{preset_id}",
                             )
-                            if analysis:
-                                preset["mv_ref_image_analysis"] = analysis
+                            save_slot = st.form_submit_button("スロット構造を保存")
+                        if save_slot:
+                            try:
+                                preset["mv_slot_structure"] = _parse_slot_json(edited_json)
                                 config["mv_presets"] = mv_presets
                                 cm.save(site_name, config)
                                 st.session_state.site_config = config
-                                st.success("分析が完了しました。")
-                        except Exception as e:
-                            st.error(f"分析エラー: {e}")
+                                st.success("保存しました")
+                                st.rerun()
+                            except ValueError:
+                                st.error("JSONの形式が不正です")
 
-            # スロット構造の表示・編集
-            preset_slot = preset.get("mv_slot_structure", {})
-            if preset_slot and preset_slot.get("slots"):
-                with st.expander("検出済みスロット構造", expanded=False):
-                    for s in preset_slot.get("slots", []):
-                        st.markdown(f"- **{s['role']}**: {s.get('description', '')}")
-                    absent = preset_slot.get("absent_slots", [])
-                    if absent:
-                        st.caption(f"不在スロット: {', '.join(absent)}")
-                    if preset_slot.get("person_style"):
-                        st.caption(f"人物: {preset_slot['person_style']}")
-                    if preset_slot.get("background_summary"):
-                        st.caption(f"背景: {preset_slot['background_summary']}")
-
-                    edited_json = st.text_area(
-                        "JSON編集（手動修正）",
-                        value=_json.dumps(preset_slot, ensure_ascii=False, indent=2),
-                        height=200,
-                        key=f"edit_slot_structure_{preset_id}",
-                    )
-                    if st.button("スロット構造を保存", key=f"save_slot_{preset_id}"):
-                        try:
-                            preset["mv_slot_structure"] = _json.loads(edited_json)
+                        if st.button("スロット構造をクリア", key=f"clear_slot_{preset_id}"):
+                            preset["mv_slot_structure"] = {}
                             config["mv_presets"] = mv_presets
-                            cm.save(site_name, config)
-                            st.session_state.site_config = config
-                            st.success("保存しました")
+                            _mark_dirty()
                             st.rerun()
-                        except _json.JSONDecodeError:
-                            st.error("JSONの形式が不正です")
-
-                    if st.button("スロット構造をクリア", key=f"clear_slot_{preset_id}"):
-                        preset["mv_slot_structure"] = {}
-                        config["mv_presets"] = mv_presets
-                        cm.save(site_name, config)
-                        st.session_state.site_config = config
-                        st.rerun()
 
             # 分析結果の表示・編集
             preset_analysis = preset.get("mv_ref_image_analysis", "")
@@ -682,7 +730,8 @@ with tab_edit:
                     value=existing_spec,
                     height=500,
                     key=f"edit_mv_design_spec_{preset_id}",
-                    placeholder=MV_DESIGN_SPEC_DEFAULT,
+                    # 入力済みならプレースホルダは見えないので、数KBの既定文を毎rerun送らない
+                    placeholder=MV_DESIGN_SPEC_DEFAULT if not existing_spec else "",
                 )
                 col_save, col_default = st.columns([2, 1])
                 with col_save:
@@ -696,8 +745,7 @@ with tab_edit:
                     if st.button("デフォルト仕様書を挿入", key=f"btn_default_spec_{preset_id}"):
                         preset["mv_design_spec"] = MV_DESIGN_SPEC_DEFAULT
                         config["mv_presets"] = mv_presets
-                        cm.save(site_name, config)
-                        st.session_state.site_config = config
+                        _mark_dirty()
                         st.rerun()
 
         # --- プリセット未使用時の後方互換表示 ---
@@ -714,11 +762,7 @@ with tab_edit:
                 for ri, rk in enumerate(ref_keys):
                     with ref_cols[ri % 5]:
                         try:
-                            from PIL import Image as PILImage
-                            import io as _io
-                            ref_data = cm.load_reference_image(rk)
-                            ref_img = PILImage.open(_io.BytesIO(ref_data))
-                            st.image(ref_img, width="stretch")
+                            st.image(_load_thumb(rk), width="stretch")
                             fname = rk.split("/")[-1]
                             st.caption(fname)
                         except Exception:
@@ -728,12 +772,15 @@ with tab_edit:
     # デザインシステムプロンプトのプレビュー
     # =============================================
     with st.expander("📋 デザインシステムプロンプト（プレビュー）", expanded=False):
-        preview = render_design_system(config)
+        preview = _design_system_preview(config)
         st.code(preview, language="text")
 
     # =============================================
     # 保存・削除
     # =============================================
+    # ここまでの_mark_dirty分を1回の書き込みに集約
+    _flush_if_dirty(cm, site_name, config)
+
     st.divider()
     save_col, delete_col = st.columns([3, 1])
     with save_col:
@@ -747,7 +794,7 @@ with tab_edit:
             st.session_state.confirm_delete_site = True
 
     # 削除確認ダイアログ
-    if st.session_state.get("confirm_delete_site"):
+    if st.session_state.confirm_delete_site:
         st.warning(f"⚠️ 「{site_name}」を本当に削除しますか？参照画像や設定も全て削除されます。")
         confirm_col1, confirm_col2 = st.columns(2)
         with confirm_col1:
@@ -28,47 +28,43 @@ with tab_taste:
     taste_categories = pm.list_taste_categories()
 
     for cat in taste_categories:
+        # 空カテゴリはexpanderを組み立てずキャプションだけ表示する
+        if cat["image_count"] == 0:
+            st.caption(f"{cat['name']}: 画像なし - {cat['description']}")
+            continue
         with st.expander(f"**{cat['name']}** ({cat['image_count']}枚) - {cat['description']}", expanded=False):
-            # 既存画像の表示
-            if cat["image_count"] > 0:
-                thumbnails = pm.get_image_thumbnails("taste", cat["id"])
-                cols = st.columns(min(4, len(thumbnails)) if thumbnails else 1)
+            thumbnails = pm.get_image_thumbnails("taste", cat["id"])
+            # 読み込み失敗で全サムネイルが落ちることがある（st.columns(0)は例外）
+            if thumbnails:
+                cols = st.columns(min(4, len(thumbnails)))
                 for i, (key, data) in enumerate(thumbnails):
                     with cols[i % 4]:
                         st.image(data, caption=key.split("/")[-1], use_container_width=True)
                         if st.button("削除", key=f"del_taste_{key}"):
                             pm.delete_image(key)
                             st.rerun()
-            else:
-                st.info("まだ参照画像がありません。下のアップロードから追加してください。")
 
-            # アップロード
-            uploaded = st.file_uploader(
-                "参照画像をアップロード",
-                accept_multiple_files=True,
-                type=["png", "jpg", "jpeg", "webp"],
-                key=f"upload_taste_{cat['id']}",
-            )
-            if uploaded:
-                for file in uploaded:
-                    pm.upload_image("taste", cat["id"], file.name, file.read())
-                st.success(f"{len(uploaded)}枚アップロードしました。")
-                st.rerun()
-
-    # カスタムカテゴリへのアップロード（常に表示）
+    # 一括アップロード（カテゴリ別ウィジェットを1つのアップローダに集約）
     st.divider()
-    st.markdown("**カスタムテイストの追加**")
-    st.caption("上記カテゴリに当てはまらないスタイルの参照画像はここにアップロード")
-    custom_taste_upload = st.file_uploader(
-        "カスタムテイスト画像",
+    st.markdown("**テイスト画像のアップロード**")
+    st.caption("既存カテゴリに当てはまらないスタイルは「カスタム」を選択")
+    taste_cat_names = {c["id"]: c["name"] for c in taste_categories}
+    taste_cat_names.setdefault("custom", "カスタム")
+    upload_taste_cat = st.selectbox(
+        "アップロード先カテゴリ",
+        list(taste_cat_names.keys()),
+        format_func=lambda cid: taste_cat_names[cid],
+        key="upload_taste_category",
+    )
+    uploaded = st.file_uploader(
+        "参照画像をアップロード",
         accept_multiple_files=True,
         type=["png", "jpg", "jpeg", "webp"],
-        key="upload_taste_custom_extra",
+        key="upload_taste_unified",
     )
-    if custom_taste_upload:
-        for file in custom_taste_upload:
-            pm.upload_image("taste", "custom", file.name, file.read())
-        st.success(f"{len(custom_taste_upload)}枚アップロードしました。")
+    if uploaded:
+        pm.upload_images_bulk("taste", upload_taste_cat, [(f.name, f.read()) for f in uploaded])
+        st.success(f"{len(uploaded)}枚アップロードしました。")
         st.rerun()
 
 # =============================================
@@ -81,44 +77,40 @@ with tab_layout:
     layout_categories = pm.list_layout_categories()
 
     for cat in layout_categories:
+        # 空カテゴリはexpanderを組み立てずキャプションだけ表示する
+        if cat["image_count"] == 0:
+            st.caption(f"{cat['name']}: 画像なし - {cat['description']}")
+            continue
         with st.expander(f"**{cat['name']}** ({cat['image_count']}枚) - {cat['description']}", expanded=False):
-            # 既存画像の表示
-            if cat["image_count"] > 0:
-                thumbnails = pm.get_image_thumbnails("layout", cat["id"])
-                cols = st.columns(min(4, len(thumbnails)) if thumbnails else 1)
+            thumbnails = pm.get_image_thumbnails("layout", cat["id"])
+            # 読み込み失敗で全サムネイルが落ちることがある（st.columns(0)は例外）
+            if thumbnails:
+                cols = st.columns(min(4, len(thumbnails)))
                 for i, (key, data) in enumerate(thumbnails):
                     with cols[i % 4]:
                         st.image(data, caption=key.split("/")[-1], use_container_width=True)
                         if st.button("削除", key=f"del_layout_{key}"):
                             pm.delete_image(key)
                             st.rerun()
-            else:
-                st.info("まだ参照画像がありません。下のアップロードから追加してください。")
 
-            # アップロード
-            uploaded = st.file_uploader(
-                "参照画像をアップロード",
-                accept_multiple_files=True,
-                type=["png", "jpg", "jpeg", "webp"],
-                key=f"upload_layout_{cat['id']}",
-            )
-            if uploaded:
-                for file in uploaded:
-                    pm.upload_image("layout", cat["id"], file.name, file.read())
-                st.success(f"{len(uploaded)}枚アップロードしました。")
-                st.rerun()
-
-    # カスタムレイアウトへのアップロード
+    # 一括アップロード（カテゴリ別ウィジェットを1つのアップローダに集約）
     st.divider()
-    st.markdown("**カスタムレイアウトの追加**")
-    custom_layout_upload = st.file_uploader(
-        "カスタムレイアウト画像",
+    st.markdown("**レイアウト画像のアップロード**")
+    layout_cat_names = {c["id"]: c["name"] for c in layout_categories}
+    layout_cat_names.setdefault("custom", "カスタム")
+    upload_layout_cat = st.selectbox(
+        "アップロード先カテゴリ",
+        list(layout_cat_names.keys()),
+        format_func=lambda cid: layout_cat_names[cid],
+        key="upload_layout_category",
+    )
+    uploaded_layout = st.file_uploader(
+        "参照画像をアップロード",
         accept_multiple_files=True,
         type=["png", "jpg", "jpeg", "webp"],
-        key="upload_layout_custom_extra",
+        key="upload_layout_unified",
     )
-    if custom_layout_upload:
-        for file in custom_layout_upload:
-            pm.upload_image("layout", "custom", file.name, file.read())
-        st.success(f"{len(custom_layout_upload)}枚アップロードしました。")
+    if uploaded_layout:
+        pm.upload_images_bulk("layout", upload_layout_cat, [(f.name, f.read()) for f in uploaded_layout])
+        st.success(f"{len(uploaded_layout)}枚アップロードしました。")
         st.rerun()
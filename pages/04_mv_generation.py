@@ -6,10 +6,16 @@ MV（メインビジュアル/アイキャッチ）画像生成ページ
 import io
 import json
 import re
+import asyncio
 import datetime
+import time
+from dataclasses import dataclass
+from math import gcd
+
 import streamlit as st
 from PIL import Image
 
+from lib.dependencies import get_config_manager
 from lib.gemini_client import GeminiClient, SUPPORTED_ASPECT_RATIOS, SUPPORTED_IMAGE_SIZES
 from lib.image_generator import get_image_client, provider_label
 from lib.article_analyzer import propose_mv_images
@@ -17,15 +23,190 @@ from lib.prompt_templates import render_design_system, render_mv_generation_prom
 from lib.image_postprocessor import (
     trim_whitespace,
     resize_to_target,
+    trim_and_resize,
     add_title_overlay,
     add_logo,
     image_to_bytes,
 )
 
 
-def get_cm():
-    from lib.dependencies import get_config_manager
-    return get_config_manager()
+# get_config_manager自体が@st.cache_resourceなので、関数呼び出し＝取得でよい
+get_cm = get_config_manager
+
+
+# スロット入力UIの設定
+# V2 slot structure uses "hook", V1 uses "hook_text" — 両方対応
+_DEFAULT_ROLES = ["hook_text", "main_title", "subtitle", "band_text", "supplement_text"]
+
+_SLOT_UI_CONFIG = {
+    "hook_text": {"label": "煽りテキスト（5〜10文字）", "placeholder": "例: 今話題の, 〇〇で人気"},
+    "hook": {"label": "煽りテキスト（5〜10文字）", "placeholder": "例: 今話題の, 〇〇で人気"},
+    "main_title": {"label": "メインタイトル（2〜15文字）", "placeholder": "例: リライブシャツ, 看護師ボーナス"},
+    "subtitle": {"label": "サブタイトル（8〜15文字）", "placeholder": "例: 本当に効果はある？"},
+    "band_text": {"label": "帯テキスト（10〜20文字）", "placeholder": "例: リアルな口コミを調査！"},
+    "supplement_text": {"label": "補足テキスト（15〜25文字）", "placeholder": "例: 期待できる効果や安く買う方法まで紹介"},
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _get_gemini_client(api_key: str) -> GeminiClient:
+    """テキスト分析用クライアント。rerunごとに作り直さず接続を使い回す"""
+    return GeminiClient(api_key=api_key)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_image_client_cached(provider: str, gemini_api_key: str, openai_api_key: str):
+    """画像生成クライアント。キーとプロバイダが同じ間は同一インスタンスを返す"""
+    return get_image_client(
+        provider=provider,
+        gemini_api_key=gemini_api_key,
+        openai_api_key=openai_api_key,
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _render_design_system_cached(config: dict) -> str:
+    """デザインシステムプロンプト。config不変なら生成ごとに再レンダしない"""
+    return render_design_system(config)
+
+
+@st.cache_data(show_spinner=False)
+def _proposal_preview_md(slot_vals: tuple, roles: tuple) -> str:
+    """MV案プレビューのMarkdown。表示対象スロットの値が変わらない限り再構築せず、
+    1回のst.markdownで送れるよう結合済み文字列を返す。
+    キャッシュキーを表示対象の値に絞ることで、person_description等の
+    無関係フィールド更新でキャッシュが無効化されない。"""
+    lines = []
+    for role, val in zip(roles, slot_vals):
+        if not val:
+            continue
+        if role == "main_title":
+            lines.append(f"### {val}")
+        elif role == "band_text":
+            lines.append(f"> {val}")
+        elif role == "supplement_text":
+            lines.append(f"*{val}*")
+        else:
+            lines.append(f"*{val}*")
+    return "\n\n".join(lines)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_trim(img_bytes: bytes) -> bytes:
+    """余白トリミング結果。同じ入力バイト列ならピクセル処理を再実行しない"""
+    return image_to_bytes(trim_whitespace(Image.open(io.BytesIO(img_bytes))), compress_level=1)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_resize(img_bytes: bytes, width: int, height: int) -> bytes:
+    """リサイズ結果。入力バイト列とサイズが同じなら再計算しない"""
+    return image_to_bytes(
+        resize_to_target(Image.open(io.BytesIO(img_bytes)), width, height),
+        compress_level=1,
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _cached_trim_resize(img_bytes: bytes, width: int, height: int) -> bytes:
+    """トリム→リサイズ融合版。中間エンコードを挟まず1デコード1エンコードで済む"""
+    return image_to_bytes(
+        trim_and_resize(Image.open(io.BytesIO(img_bytes)), width, height),
+        compress_level=1,
+    )
+
+
+def _entry_source_bytes(entry, processed):
+    """後処理の入力バイト列。加工済みがあればそれを、無ければAPIバイト列を使う"""
+    if processed is not None:
+        return image_to_bytes(processed, compress_level=1)
+    return entry.get("image_bytes") or image_to_bytes(_entry_pil(entry), compress_level=1)
+
+
+@st.cache_data(show_spinner=False)
+def _site_colors(config: dict) -> dict:
+    """MV生成で最優先されるサイトカラー。configが変わるまで再構築しない"""
+    return {
+        "primary_color": config.get("primary_color", "#3B82F6"),
+        "secondary_color": config.get("secondary_color", "#10B981"),
+        "accent_color": config.get("accent_color", "#F59E0B"),
+        "background_color": config.get("background_color", "#FFFFFF"),
+        "text_color": config.get("text_color", "#1F2937"),
+        "danger_color": config.get("danger_color", "#E74A3B"),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _preset_labels(mv_presets: list) -> list:
+    """プリセット選択プルダウンのラベル一覧"""
+    labels = []
+    for p in mv_presets:
+        slot_info = ""
+        slot_struct = p.get("mv_slot_structure", {})
+        if slot_struct and slot_struct.get("slots"):
+            roles = [s["role"] for s in slot_struct["slots"]]
+            slot_info = f"（{', '.join(roles)}）"
+        labels.append(f"{p['name']}{slot_info}")
+    return labels
+
+
+@st.cache_data(show_spinner=False)
+def _thumb_bytes(image_bytes: bytes, max_side: int = 800) -> bytes:
+    """画面プレビュー用の縮小JPEG。表示列は~600pxなのでフル解像度を送らない"""
+    im = Image.open(io.BytesIO(image_bytes))
+    im.thumbnail((max_side, max_side), Image.LANCZOS)
+    buf = io.BytesIO()
+    im.convert("RGB").save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def _render_mv_prompt_cached(
+    design_system,
+    mv_proposal,
+    aspect_ratio,
+    language,
+    has_reference_images,
+    mv_design_analysis,
+    site_colors,
+    mv_design_spec,
+    mv_style_hints,
+    mv_slot_structure,
+    image_width,
+    image_height,
+):
+    """MV生成プロンプト。再生成・refineで入力が同じなら文字列構築を繰り返さない"""
+    return render_mv_generation_prompt(
+        design_system=design_system,
+        mv_proposal=mv_proposal,
+        aspect_ratio=aspect_ratio,
+        language=language,
+        has_reference_images=has_reference_images,
+        mv_design_analysis=mv_design_analysis,
+        site_colors=site_colors,
+        mv_design_spec=mv_design_spec,
+        mv_style_hints=mv_style_hints,
+        mv_slot_structure=mv_slot_structure,
+        image_width=image_width,
+        image_height=image_height,
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_ref_bytes(site_name: str, category: str, preset_id: str | None, keys: tuple) -> list:
+    """参照画像の(バイト列, MIME)一覧をキー一覧で固定してキャッシュする。
+
+    バイト列のままGeminiへ渡せばSDK側のPIL→PNG再エンコードも省ける。
+    ストレージにmtimeの抽象がないため、キー一覧の変化（追加・削除）を
+    キャッシュ無効化のトリガーにしている。同名ファイルでの差し替えは
+    キー一覧が変わらず検知できないため、TTLで上限を切る（_load_thumbと同様）。
+    """
+    return get_cm().get_reference_image_bytes(site_name, category=category, preset_id=preset_id)
+
+
+def _ref_bytes(site_name, category, preset_id=None):
+    """参照画像をキャッシュ経由で取得する"""
+    keys = tuple(get_cm().list_reference_images(site_name, category=category, preset_id=preset_id))
+    return _cached_ref_bytes(site_name, category, preset_id, keys)
 
 
 def _save_to_storage(image, site_name: str, label: str):
@@ -41,92 +222,153 @@ def _save_to_storage(image, site_name: str, label: str):
 
 
 def _get_preset_data(config, site_name):
-    """選択中プリセットのデータを取得する。プリセット未使用時はサイトレベルを返す。"""
-    cm = get_cm()
-    mv_presets = config.get("mv_presets", [])
+    """選択中プリセットのデータを取得する。プリセット未使用時はサイトレベルを返す。
+
+    ヘッダー・Step 2/3・生成処理から1回のrerunで複数回呼ばれるため、
+    結果はrerun内メモ（_preset_data_cache）に保持する。
+    """
     preset_id = st.session_state.get("mv_active_preset_id", None)
+    cache = st.session_state.setdefault("_preset_data_cache", {})
+    cache_key = (preset_id, site_name)
+    if cache_key in cache:
+        return cache[cache_key]
 
+    mv_presets = config.get("mv_presets", [])
+    data = None
     if preset_id and mv_presets:
-        preset = next((p for p in mv_presets if p["id"] == preset_id), None)
+        idx_preset = st.session_state.get("_presets_by_id", {}).get(preset_id)
+        preset = idx_preset[1] if idx_preset else None
         if preset:
-            return {
+            data = {
                 "preset_id": preset_id,
-                "mv_ref_images": cm.get_reference_pil_images(site_name, category="mv", preset_id=preset_id) if site_name else [],
+                "mv_ref_images": _ref_bytes(site_name, "mv", preset_id) if site_name else [],
                 "mv_design_analysis": preset.get("mv_ref_image_analysis", ""),
                 "mv_design_spec": preset.get("mv_design_spec", ""),
                 "mv_style_hints": preset.get("mv_style_hints", None),
                 "mv_slot_structure": preset.get("mv_slot_structure", None),
             }
 
-    # 後方互換: サイトレベルのデータを使用
-    return {
-        "preset_id": None,
-        "mv_ref_images": cm.get_reference_pil_images(site_name, category="mv") if site_name else [],
-        "mv_design_analysis": config.get("mv_ref_image_analysis", ""),
-        "mv_design_spec": config.get("mv_design_spec", ""),
-        "mv_style_hints": config.get("mv_style_hints", None),
-        "mv_slot_structure": config.get("mv_slot_structure", None),
-    }
+    if data is None:
+        # 後方互換: サイトレベルのデータを使用
+        data = {
+            "preset_id": None,
+            "mv_ref_images": _ref_bytes(site_name, "mv") if site_name else [],
+            "mv_design_analysis": config.get("mv_ref_image_analysis", ""),
+            "mv_design_spec": config.get("mv_design_spec", ""),
+            "mv_style_hints": config.get("mv_style_hints", None),
+            "mv_slot_structure": config.get("mv_slot_structure", None),
+        }
 
+    cache[cache_key] = data
+    return data
 
-def generate_mv_image(mv_proposal, idx, config, aspect_ratio, image_size, site_name=None, image_width=None, image_height=None):
-    """1案分のMV画像を生成して session_state.mv_generated_images に追加する"""
-    # 画像生成クライアント (プロバイダ選択に応じて Gemini or OpenAI)
-    image_client = get_image_client(
-        provider=st.session_state.image_provider,
-        gemini_api_key=st.session_state.api_key,
-        openai_api_key=st.session_state.openai_api_key,
-    )
-    design_system = render_design_system(config)
 
-    # プリセットまたはサイトレベルのデータを取得
-    pd = _get_preset_data(config, site_name)
+@dataclass(frozen=True, slots=True)
+class MvGenContext:
+    """MV生成に必要なconfig由来の値を固めた不変コンテキスト。
 
-    mv_ref_images = pd["mv_ref_images"]
-    if mv_ref_images:
-        reference_images = mv_ref_images
-        st.info(f"MV参照画像を{len(mv_ref_images)}枚使用")
-    else:
-        reference_images = []
+    configのdict全体をワーカースレッドへ持ち回らないための入れ物。
+    rerun（または一括生成）につき1回だけ構築する。
+    """
+    design_system: str
+    site_colors: dict
+    mv_design_analysis: str
+    mv_design_spec: str
+    mv_style_hints: dict | None
+    mv_slot_structure: dict | None
+    language: str
+    reference_images: tuple
 
-    # MV参照画像の分析結果を取得
-    mv_design_analysis = pd["mv_design_analysis"]
 
-    # サイトカラー（MV生成で最優先される）
-    site_colors = {
-        "primary_color": config.get("primary_color", "#3B82F6"),
-        "secondary_color": config.get("secondary_color", "#10B981"),
-        "accent_color": config.get("accent_color", "#F59E0B"),
-        "background_color": config.get("background_color", "#FFFFFF"),
-        "text_color": config.get("text_color", "#1F2937"),
-        "danger_color": config.get("danger_color", "#E74A3B"),
-    }
+def _entry_pil(entry):
+    """entryのPIL画像を返す。bytesしか保持していない場合のみデコードする"""
+    if entry.get("image") is None and entry.get("image_bytes"):
+        entry["image"] = Image.open(io.BytesIO(entry["image_bytes"]))
+    return entry["image"]
 
-    # MVデザイン仕様書
-    mv_design_spec = pd["mv_design_spec"]
 
-    # サイト別MVスタイル補強ヒント
-    mv_style_hints = pd["mv_style_hints"]
+def _build_mv_context(config, site_name):
+    """生成コンテキストをメインスレッドで構築する。
+
+    session_stateやst.cacheに触る処理はすべてここに集約し、
+    ワーカースレッドには純粋なAPI呼び出しだけを渡す。
+    """
+    pd = _get_preset_data(config, site_name)
+    return MvGenContext(
+        design_system=_render_design_system_cached(config),
+        site_colors=_site_colors(config),
+        mv_design_analysis=pd["mv_design_analysis"],
+        mv_design_spec=pd["mv_design_spec"],
+        mv_style_hints=pd["mv_style_hints"],
+        mv_slot_structure=pd["mv_slot_structure"],
+        language=config.get("language", "Japanese"),
+        reference_images=tuple(pd["mv_ref_images"] or ()),
+    )
 
-    # MVスロット構造
-    mv_slot_structure = pd["mv_slot_structure"]
 
+def _prepare_mv_generation(ctx: MvGenContext, mv_proposal, aspect_ratio, image_width=None, image_height=None):
+    """コンテキストから1案分の生成プロンプトを組み立てる"""
     # MV生成プロンプト（サイズはテンプレート内に構造的に埋め込まれる）
-    gen_prompt = render_mv_generation_prompt(
-        design_system=design_system,
-        mv_proposal=mv_proposal,
-        aspect_ratio=aspect_ratio,
-        language=config.get("language", "Japanese"),
-        has_reference_images=bool(reference_images),
-        mv_design_analysis=mv_design_analysis,
-        site_colors=site_colors,
-        mv_design_spec=mv_design_spec,
-        mv_style_hints=mv_style_hints,
-        mv_slot_structure=mv_slot_structure,
-        image_width=image_width,
-        image_height=image_height,
+    return _render_mv_prompt_cached(
+        ctx.design_system,
+        mv_proposal,
+        aspect_ratio,
+        ctx.language,
+        bool(ctx.reference_images),
+        ctx.mv_design_analysis,
+        ctx.site_colors,
+        ctx.mv_design_spec,
+        ctx.mv_style_hints,
+        ctx.mv_slot_structure,
+        image_width,
+        image_height,
     )
 
+
+def _store_mv_result(mv_proposal, idx, gen_image, gen_text, gen_prompt, site_name):
+    """生成結果をストレージとsession_stateへ反映する（メインスレッド専用）"""
+    # 既存の同じproposal_idxの結果はO(1)で位置を引いて上書き
+    pos = st.session_state.mv_generated_by_idx.get(idx)
+    # ストレージに自動保存
+    label = mv_proposal.get("main_title", f"mv_{idx}")
+    saved_key = _save_to_storage(gen_image, site_name or "unknown", label)
+    entry = {
+        "proposal_idx": idx,
+        "proposal": mv_proposal,
+        "image": gen_image,
+        "image_bytes": getattr(gen_image, "raw_bytes", None),
+        "image_mime": getattr(gen_image, "raw_mime", None),
+        "processed_image": None,
+        "response_text": gen_text,
+        "generation_prompt": gen_prompt,
+        "saved_key": saved_key,
+        # 生成のレイテンシ窓内ではエポック秒だけ記録し、整形は表示時に行う
+        "ts": time.time(),
+    }
+    if pos is not None:
+        st.session_state.mv_generated_images[pos] = entry
+    else:
+        st.session_state.mv_generated_images.append(entry)
+        st.session_state.mv_generated_by_idx[idx] = len(st.session_state.mv_generated_images) - 1
+
+
+def generate_mv_image(mv_proposal, idx, config, aspect_ratio, image_size, site_name=None, image_width=None, image_height=None):
+    """1案分のMV画像を生成して session_state.mv_generated_images に追加する"""
+    # 画像生成クライアント (プロバイダ選択に応じて Gemini or OpenAI)
+    image_client = _get_image_client_cached(
+        st.session_state.image_provider,
+        st.session_state.api_key,
+        st.session_state.openai_api_key,
+    )
+    ctx = _build_mv_context(config, site_name)
+    gen_prompt = _prepare_mv_generation(
+        ctx, mv_proposal, aspect_ratio,
+        image_width=image_width, image_height=image_height,
+    )
+    reference_images = list(ctx.reference_images)
+    if reference_images:
+        st.info(f"MV参照画像を{len(reference_images)}枚使用")
+
     # 画像生成 API 呼び出し（プロバイダは UI で選択された方）
     gen_image, gen_text = image_client.generate_image(
         prompt=gen_prompt,
@@ -136,63 +378,59 @@ def generate_mv_image(mv_proposal, idx, config, aspect_ratio, image_size, site_n
     )
 
     if gen_image:
-        # 既存の同じproposal_idxの結果を上書き
-        existing = [
-            j for j, e in enumerate(st.session_state.mv_generated_images)
-            if e["proposal_idx"] == idx
-        ]
-        # ストレージに自動保存
-        label = mv_proposal.get("main_title", f"mv_{idx}")
-        saved_key = _save_to_storage(gen_image, site_name or "unknown", label)
-        entry = {
-            "proposal_idx": idx,
-            "proposal": mv_proposal,
-            "image": gen_image,
-            "processed_image": None,
-            "response_text": gen_text,
-            "generation_prompt": gen_prompt,
-            "saved_key": saved_key,
-            "timestamp": datetime.datetime.now().isoformat(),
-        }
-        if existing:
-            st.session_state.mv_generated_images[existing[0]] = entry
-        else:
-            st.session_state.mv_generated_images.append(entry)
+        _store_mv_result(mv_proposal, idx, gen_image, gen_text, gen_prompt, site_name)
         return True, gen_text
     else:
         return False, gen_text
 
 
+def _build_refine_instruction(entry, refinement_text):
+    """refine用の指示文を組み立てる（元の生成プロンプト + 修正指示）"""
+    original_prompt = entry.get("generation_prompt", "")
+    if original_prompt:
+        return (
+            f"上記の最後の1枚は、以下のプロンプトで生成した画像です。\n\n"
+            f"--- 元のプロンプト ---\n{original_prompt}\n--- ここまで ---\n\n"
+            f"この画像を以下の点だけ修正してください。それ以外のレイアウト・テキスト内容・配色・装飾はすべて維持すること。\n\n"
+            f"【修正指示】\n{refinement_text}"
+        )
+    # フォールバック（generation_prompt未保存の古いエントリ）
+    return (
+        "上記の最後の1枚を以下の指示に従って微修正してください。"
+        "レイアウト構造・テキスト内容・テキスト装飾スタイル・配色は変更せず、指示された部分のみを修正してください。\n\n"
+        f"【修正指示】\n{refinement_text}"
+    )
+
+
+def _apply_refine_result(entry, gen_image, gen_text):
+    """refine結果をentryへ反映する（メインスレッド専用）"""
+    raw = getattr(gen_image, "raw_bytes", None)
+    # bytesを正とし、PILデコードは後処理で必要になるまで遅延させる
+    entry["image"] = None if raw else gen_image
+    entry["image_bytes"] = raw
+    entry["image_mime"] = getattr(gen_image, "raw_mime", None)
+    entry["processed_image"] = None
+    entry["response_text"] = gen_text
+    entry["ts"] = time.time()
+    entry.pop("_png_cache", None)
+    entry.pop("_png_src_id", None)
+
+
 def refine_mv_image(entry_index, refinement_text, config, site_name=None):
     """生成済みMV画像に微修正を加えて再生成する"""
-    image_client = get_image_client(
-        provider=st.session_state.image_provider,
-        gemini_api_key=st.session_state.api_key,
-        openai_api_key=st.session_state.openai_api_key,
+    image_client = _get_image_client_cached(
+        st.session_state.image_provider,
+        st.session_state.api_key,
+        st.session_state.openai_api_key,
     )
     entry = st.session_state.mv_generated_images[entry_index]
-    current_img = entry.get("processed_image") or entry["image"]
+    current_img = entry.get("processed_image") or _entry_pil(entry)
 
     # MV参照画像を取得（プリセット対応）
     pd = _get_preset_data(config, site_name)
     mv_ref_images = pd["mv_ref_images"]
 
-    # 元の生成プロンプト + 修正指示
-    original_prompt = entry.get("generation_prompt", "")
-    if original_prompt:
-        instruction = (
-            f"上記の最後の1枚は、以下のプロンプトで生成した画像です。\n\n"
-            f"--- 元のプロンプト ---\n{original_prompt}\n--- ここまで ---\n\n"
-            f"この画像を以下の点だけ修正してください。それ以外のレイアウト・テキスト内容・配色・装飾はすべて維持すること。\n\n"
-            f"【修正指示】\n{refinement_text}"
-        )
-    else:
-        # フォールバック（generation_prompt未保存の古いエントリ）
-        instruction = (
-            "上記の最後の1枚を以下の指示に従って微修正してください。"
-            "レイアウト構造・テキスト内容・テキスト装飾スタイル・配色は変更せず、指示された部分のみを修正してください。\n\n"
-            f"【修正指示】\n{refinement_text}"
-        )
+    instruction = _build_refine_instruction(entry, refinement_text)
 
     gen_image, gen_text = image_client.refine_image(
         current_image=current_img,
@@ -201,19 +439,212 @@ def refine_mv_image(entry_index, refinement_text, config, site_name=None):
     )
 
     if gen_image:
-        entry["image"] = gen_image
-        entry["processed_image"] = None
-        entry["response_text"] = gen_text
-        entry["timestamp"] = datetime.datetime.now().isoformat()
+        _apply_refine_result(entry, gen_image, gen_text)
         return True, gen_text
     return False, gen_text
 
 
+@st.fragment
+def _render_proposal_editor(i, active_roles):
+    """MV案エディタ。フラグメント化により編集操作はこの案の再描画だけで済む"""
+    mv_proposal = st.session_state.mv_proposals[i]
+    with st.expander(f"MV案{i+1}を編集", expanded=(len(st.session_state.mv_proposals) == 1)):
+        # プレビュー（現在の内容を表示）
+        st.markdown("**現在のテキスト内容:**")
+        preview_col1, preview_col2 = st.columns([2, 1])
+        with preview_col1:
+            # スロットごとのウィジェットを並べず、結合済みMarkdownを1回で送る
+            preview_roles = tuple(active_roles or _DEFAULT_ROLES)
+            preview_md = _proposal_preview_md(
+                tuple(mv_proposal.get(r, "") for r in preview_roles),
+                preview_roles,
+            )
+            if preview_md:
+                st.markdown(preview_md)
+
+        with preview_col2:
+            person = mv_proposal.get("person_description", "")
+            if person:
+                st.markdown(f"**人物:** {person}")
+
+        st.divider()
+        st.markdown("**各スロットを編集:**")
+
+        # formで囲み、スロット編集中のキー入力でrerunされないようにする
+        with st.form(f"mv_edit_{i}"):
+            edited_vals = {}
+            # 動的スロットUI: active_rolesがある場合はそのスロットのみ表示
+            display_roles = active_roles or _DEFAULT_ROLES
+            for role in display_roles:
+                ui_conf = _SLOT_UI_CONFIG.get(role, {"label": role, "placeholder": ""})
+                edited_vals[role] = st.text_input(
+                    ui_conf["label"],
+                    value=mv_proposal.get(role, ""),
+                    placeholder=ui_conf["placeholder"],
+                    key=f"mv_{role}_{i}",
+                )
+
+            # メイン人物（常に表示）
+            edited_vals["person_description"] = st.text_area(
+                "メイン人物の説明",
+                value=mv_proposal.get("person_description", ""),
+                placeholder="例: スマホで口コミを見ている若い女性、リラックスした表情",
+                height=80,
+                key=f"mv_person_{i}",
+            )
+            if st.form_submit_button("この案を更新"):
+                mv_proposal.update(edited_vals)
+                st.rerun()  # プレビューへ即時反映（フラグメント内で完結）
+
+
+@st.fragment
+def _render_result_entry(i, config):
+    """生成結果1件分のパネル。フラグメント化により他エントリの再描画を巻き込まない"""
+    entry = st.session_state.mv_generated_images[i]
+    mv_proposal = entry["proposal"]
+    processed = entry.get("processed_image")
+
+    st.markdown(f"### MV案{entry['proposal_idx']+1}: {mv_proposal.get('main_title', '')} - {mv_proposal.get('subtitle', '')}")
+
+    display_col, control_col = st.columns([2, 1])
+
+    with display_col:
+        if processed is None and entry.get("image_bytes"):
+            # 未加工なら縮小サムネイルを送る（フル解像度はダウンロード時のみ）
+            st.image(_thumb_bytes(entry["image_bytes"]), width="stretch")
+        else:
+            st.image(processed if processed else _entry_pil(entry), width="stretch")
+
+    with control_col:
+        # --- 微修正 ---
+        st.markdown("**✏️ 微修正**")
+        refine_text = st.text_area(
+            "修正指示",
+            placeholder="例: 人物をもう少し大きく、背景の色をもう少し明るく",
+            height=80,
+            key=f"mv_refine_text_{i}",
+        )
+        if st.button("微修正して再生成", key=f"mv_refine_btn_{i}", disabled=not refine_text.strip()):
+            with st.spinner("微修正中..."):
+                try:
+                    ok, text = refine_mv_image(
+                        i, refine_text, config,
+                        site_name=st.session_state.current_site,
+                    )
+                    if ok:
+                        st.success("微修正完了!")
+                    else:
+                        st.warning(f"微修正に失敗: {text or ''}")
+                except Exception as e:
+                    st.error(f"微修正エラー: {e}")
+            st.rerun()
+
+        # --- 再生成 ---
+        st.divider()
+        if st.button("同じ案で再生成", key=f"mv_regen_btn_{i}", use_container_width=True):
+            with st.spinner("再生成中..."):
+                try:
+                    ok, text = generate_mv_image(
+                        mv_proposal, entry["proposal_idx"], config,
+                        st.session_state.get("mv_gen_aspect_ratio", "16:9"),
+                        st.session_state.get("mv_gen_image_size", "2K"),
+                        site_name=st.session_state.current_site,
+                    )
+                    if ok:
+                        st.success("再生成完了!")
+                    else:
+                        st.warning(f"再生成に失敗: {text or ''}")
+                except Exception as e:
+                    st.error(f"再生成エラー: {e}")
+            st.rerun()
+
+        # --- 後処理 ---
+        st.divider()
+        st.markdown("**後処理**")
+
+        # トリミング
+        if st.button("余白トリミング", key=f"mv_trim_{i}"):
+            src = entry.get("image_bytes") or image_to_bytes(_entry_pil(entry), compress_level=1)
+            entry["processed_image"] = Image.open(io.BytesIO(_cached_trim(src)))
+            entry.pop("_png_cache", None)
+            st.rerun()
+
+        # リサイズ
+        current_img = processed if processed else _entry_pil(entry)
+        cur_w, cur_h = current_img.size
+        st.caption(f"現在: {cur_w}×{cur_h}px")
+
+        mv_size = config.get("image_sizes", {}).get("mv", {"width": 1200, "height": 630})
+        resize_c1, resize_c2 = st.columns(2)
+        with resize_c1:
+            target_w = st.number_input(
+                "幅(px)", value=mv_size.get("width", 1200), min_value=100, max_value=4096,
+                key=f"mv_resize_w_{i}",
+            )
+        with resize_c2:
+            target_h = st.number_input(
+                "高さ(px)", value=mv_size.get("height", 630), min_value=100, max_value=4096,
+                key=f"mv_resize_h_{i}",
+            )
+        resize_b1, resize_b2 = st.columns(2)
+        with resize_b1:
+            if st.button(f"リサイズ ({target_w}×{target_h})", key=f"mv_resize_{i}"):
+                src = _entry_source_bytes(entry, processed)
+                entry["processed_image"] = Image.open(io.BytesIO(_cached_resize(src, target_w, target_h)))
+                entry.pop("_png_cache", None)
+                st.rerun()
+        with resize_b2:
+            # トリム→リサイズを1パスで行う（個別ボタン2回より中間エンコード1回分速い）
+            if st.button("トリム+リサイズ", key=f"mv_trim_resize_{i}"):
+                src = entry.get("image_bytes") or image_to_bytes(_entry_pil(entry), compress_level=1)
+                entry["processed_image"] = Image.open(io.BytesIO(_cached_trim_resize(src, target_w, target_h)))
+                entry.pop("_png_cache", None)
+                st.rerun()
+
+        # ダウンロード
+        st.divider()
+        if processed is None and entry.get("image_bytes"):
+            # 未加工ならAPIが返したエンコード済みバイト列をそのまま渡す
+            # （rerunごとの多メガピクセルPNGエンコードを省く）
+            img_bytes = entry["image_bytes"]
+            dl_mime = entry.get("image_mime") or "image/png"
+        else:
+            download_img = processed if processed else _entry_pil(entry)
+            # PNGエンコードはエントリ単位でキャッシュし、画像が差し替わったときだけ再実行
+            img_bytes = entry.get("_png_cache")
+            if img_bytes is None or entry.get("_png_src_id") != id(download_img):
+                img_bytes = image_to_bytes(download_img)
+                entry["_png_cache"] = img_bytes
+                entry["_png_src_id"] = id(download_img)
+            dl_mime = "image/png"
+        dl_ext = "jpg" if dl_mime == "image/jpeg" else "png"
+        st.download_button(
+            "この画像をダウンロード",
+            data=img_bytes,
+            file_name=f"mv_image_{entry['proposal_idx']+1}_{i}.{dl_ext}",
+            mime=dl_mime,
+            key=f"mv_dl_{i}",
+            width="stretch",
+        )
+
+    st.divider()
+
+
 # =============================================
 # ヘッダー
 # =============================================
 st.title("MV画像生成")
 
+# rerun内メモはスクリプト先頭でリセット（configの編集を翌rerunで反映させる）
+st.session_state._preset_data_cache = {}
+
+# proposal_idx → 結果リスト位置の索引。既存セッションでは遅延再構築する
+if "mv_generated_by_idx" not in st.session_state:
+    st.session_state.mv_generated_by_idx = {
+        e["proposal_idx"]: j
+        for j, e in enumerate(st.session_state.get("mv_generated_images", []))
+    }
+
 if not st.session_state.current_site:
     st.warning("サイドバーからサイトを選択するか、「サイト設定」から新規登録してください。")
     st.stop()
@@ -235,24 +666,18 @@ st.info(f"対象サイト: **{config.get('brand_name', st.session_state.current_
 cm = get_cm()
 mv_presets = config.get("mv_presets", [])
 
+# id → (リスト位置, preset) の索引。ヘッダーと_get_preset_dataで共有し、
+# 呼び出しごとの線形探索を避ける
+_presets_by_id = {p["id"]: (i, p) for i, p in enumerate(mv_presets)}
+st.session_state._presets_by_id = _presets_by_id
+
 if mv_presets:
     # プリセットがある場合はプルダウン表示
-    preset_labels = []
-    for p in mv_presets:
-        slot_info = ""
-        slot_struct = p.get("mv_slot_structure", {})
-        if slot_struct and slot_struct.get("slots"):
-            roles = [s["role"] for s in slot_struct["slots"]]
-            slot_info = f"（{', '.join(roles)}）"
-        preset_labels.append(f"{p['name']}{slot_info}")
+    preset_labels = _preset_labels(mv_presets)
 
     # 初期値をセッションステートから復元
     active_preset_id = st.session_state.get("mv_active_preset_id", mv_presets[0]["id"])
-    active_idx = 0
-    for pi, p in enumerate(mv_presets):
-        if p["id"] == active_preset_id:
-            active_idx = pi
-            break
+    active_idx = _presets_by_id.get(active_preset_id, (0, None))[0]
 
     selected_preset_label = st.selectbox(
         "MVプリセット",
@@ -304,22 +729,26 @@ else:
 # =============================================
 st.subheader("Step 1: 記事情報")
 
-article_title = st.text_input(
-    "記事タイトル",
-    value=st.session_state.article_title,
-    placeholder="例: リライブシャツの口コミ・評判を調査！本当に効果はある？",
-    key="mv_input_article_title",
-)
-st.session_state.article_title = article_title
-
-article_text = st.text_area(
-    "記事本文（概要把握用。全文でなくてもOK）",
-    value=st.session_state.article_text,
-    height=200,
-    placeholder="記事の本文をここに貼り付けてください...",
-    key="mv_input_article_text",
-)
-st.session_state.article_text = article_text
+# ウィジェットのkeyに共有キーを直接束縛（二重書き込み廃止）。
+# key直結の状態はページ遷移で破棄されるため、自己代入で保持しておく
+st.session_state.article_title = st.session_state.article_title
+st.session_state.article_text = st.session_state.article_text
+
+# formで囲み、キー入力のたびにページ全体がrerunされないようにする
+# （form内ウィジェットのsession_state反映はsubmit時に行われる）
+with st.form("mv_article_form"):
+    article_title = st.text_input(
+        "記事タイトル",
+        placeholder="例: リライブシャツの口コミ・評判を調査！本当に効果はある？",
+        key="article_title",
+    )
+    article_text = st.text_area(
+        "記事本文（概要把握用。全文でなくてもOK）",
+        height=200,
+        placeholder="記事の本文をここに貼り付けてください...",
+        key="article_text",
+    )
+    st.form_submit_button("記事情報を反映")
 
 # =============================================
 # Step 2: MV案の自動生成 or 手動入力
@@ -348,7 +777,7 @@ if btn_auto and article_title.strip():
     with st.status("MVテキスト案を生成中...", expanded=True) as status:
         try:
             st.write("記事の主題を分析し、MVテキスト案を設計中...")
-            gemini = GeminiClient(api_key=st.session_state.api_key)
+            gemini = _get_gemini_client(st.session_state.api_key)
             _pd = _get_preset_data(config, st.session_state.current_site)
             mv_slot_structure = _pd["mv_slot_structure"]
             mv_proposals = propose_mv_images(
@@ -430,68 +859,13 @@ if st.session_state.mv_proposals:
 背景: 上部カラーグラデーション → 下部ホワイト
             """, language="text")
 
-    # スロット入力UIの設定
-    # V2 slot structure uses "hook", V1 uses "hook_text" — 両方対応
-    slot_ui_config = {
-        "hook_text": {"label": "煽りテキスト（5〜10文字）", "placeholder": "例: 今話題の, 〇〇で人気"},
-        "hook": {"label": "煽りテキスト（5〜10文字）", "placeholder": "例: 今話題の, 〇〇で人気"},
-        "main_title": {"label": "メインタイトル（2〜15文字）", "placeholder": "例: リライブシャツ, 看護師ボーナス"},
-        "subtitle": {"label": "サブタイトル（8〜15文字）", "placeholder": "例: 本当に効果はある？"},
-        "band_text": {"label": "帯テキスト（10〜20文字）", "placeholder": "例: リアルな口コミを調査！"},
-        "supplement_text": {"label": "補足テキスト（15〜25文字）", "placeholder": "例: 期待できる効果や安く買う方法まで紹介"},
-    }
-
     for i, mv_proposal in enumerate(mv_proposals):
         mv_selected[i] = st.checkbox(
             f"MV案{i+1}: {mv_proposal.get('main_title', '未設定')}",
             value=mv_selected[i],
             key=f"mv_select_{i}",
         )
-
-        with st.expander(f"MV案{i+1}を編集", expanded=(len(mv_proposals) == 1)):
-            # プレビュー（現在の内容を表示）
-            st.markdown("**現在のテキスト内容:**")
-            preview_col1, preview_col2 = st.columns([2, 1])
-            with preview_col1:
-                for role in (active_roles or ["hook_text", "main_title", "subtitle", "band_text", "supplement_text"]):
-                    val = mv_proposal.get(role, "")
-                    if val:
-                        if role == "main_title":
-                            st.markdown(f"### {val}")
-                        elif role == "band_text":
-                            st.info(val)
-                        elif role == "supplement_text":
-                            st.caption(val)
-                        else:
-                            st.markdown(f"*{val}*")
-
-            with preview_col2:
-                person = mv_proposal.get("person_description", "")
-                if person:
-                    st.markdown(f"**人物:** {person}")
-
-            st.divider()
-            st.markdown("**各スロットを編集:**")
-
-            # 動的スロットUI: active_rolesがある場合はそのスロットのみ表示
-            display_roles = active_roles or ["hook_text", "main_title", "subtitle", "band_text", "supplement_text"]
-            for role in display_roles:
-                ui_conf = slot_ui_config.get(role, {"label": role, "placeholder": ""})
-                mv_proposal[role] = st.text_input(
-                    ui_conf["label"],
-                    value=mv_proposal.get(role, ""),
-                    placeholder=ui_conf["placeholder"],
-                    key=f"mv_{role}_{i}",
-                )
-
-            # メイン人物（常に表示）
-            mv_proposal["person_description"] = st.text_area(
-                "メイン人物の説明",
-                value=mv_proposal.get("person_description", ""),
-                placeholder="例: スマホで口コミを見ている若い女性、リラックスした表情",
-                height=80,
-                key=f"mv_person_{i}",
-            )
+        _render_proposal_editor(i, active_roles)
 
     st.session_state.mv_selected_proposals = mv_selected
 
@@ -521,7 +895,6 @@ if st.session_state.mv_proposals:
         )
 
     # サイズからアスペクト比を自動算出（Gemini APIに渡す用）
-    from math import gcd
     _g = gcd(mv_width, mv_height)
     _ratio_w, _ratio_h = mv_width // _g, mv_height // _g
     # Gemini APIが受け付ける固定値に最も近いものを選ぶ
@@ -547,6 +920,75 @@ if st.session_state.mv_proposals:
     if st.session_state.mv_generation_in_progress:
         st.session_state.mv_generation_in_progress = False
 
+    # --- 選択案の一括生成（API呼び出しを並列化） ---
+    bulk_targets = [i for i, sel in enumerate(mv_selected) if sel]
+    if st.button(
+        f"選択した{len(bulk_targets)}案を一括生成",
+        type="primary",
+        disabled=not bulk_targets,
+        use_container_width=True,
+        key="mv_gen_bulk",
+    ):
+        image_client = _get_image_client_cached(
+            st.session_state.image_provider,
+            st.session_state.api_key,
+            st.session_state.openai_api_key,
+        )
+        with st.status(f"{len(bulk_targets)}案を並列生成中...", expanded=True) as status:
+            # コンテキストは1回だけ構築し、プロンプト組み立てと
+            # session_stateアクセスはメインスレッドで済ませる
+            # （ワーカーには純粋なAPI呼び出しだけを投げる）
+            ctx = _build_mv_context(config, st.session_state.current_site)
+            prepared = {
+                i: _prepare_mv_generation(
+                    ctx, mv_proposals[i], mv_aspect_ratio,
+                    image_width=mv_width, image_height=mv_height,
+                )
+                for i in bulk_targets
+            }
+            ref_list = list(ctx.reference_images)
+
+            async def _run_bulk():
+                # Geminiのレート制限を踏まえ同時実行は4本まで。
+                # API呼び出し自体はブロッキングなのでto_threadへ逃がす
+                sem = asyncio.Semaphore(4)
+
+                async def _one(i):
+                    async with sem:
+                        return i, await asyncio.to_thread(
+                            image_client.generate_image,
+                            prompt=prepared[i],
+                            reference_images=ref_list or None,
+                            aspect_ratio=mv_aspect_ratio,
+                            image_size=mv_image_size,
+                        )
+
+                return await asyncio.gather(
+                    *(_one(i) for i in bulk_targets), return_exceptions=True
+                )
+
+            failed = 0
+            for result in asyncio.run(_run_bulk()):
+                if isinstance(result, Exception):
+                    failed += 1
+                    st.error(f"生成中にエラー: {result}")
+                    continue
+                i, (gen_image, gen_text) = result
+                if gen_image:
+                    _store_mv_result(
+                        mv_proposals[i], i, gen_image, gen_text,
+                        prepared[i], st.session_state.current_site,
+                    )
+                    st.write(f"MV案{i+1}: 生成完了")
+                else:
+                    failed += 1
+                    st.warning(f"MV案{i+1}: 生成に失敗 {gen_text or ''}")
+            if failed:
+                status.update(label=f"一括生成完了（{failed}案失敗）", state="error")
+            else:
+                status.update(label=f"{len(bulk_targets)}案の生成完了!", state="complete")
+        st.rerun()
+
     # 個別生成ボタン群
     single_cols = st.columns(min(len(mv_proposals), 3))
     single_btns = {}
@@ -592,106 +1034,63 @@ if st.session_state.mv_generated_images:
 
     mv_images = st.session_state.mv_generated_images
 
-    for i, entry in enumerate(mv_images):
-        mv_proposal = entry["proposal"]
-        img = entry["image"]
-        processed = entry.get("processed_image")
-
-        st.markdown(f"### MV案{entry['proposal_idx']+1}: {mv_proposal.get('main_title', '')} - {mv_proposal.get('subtitle', '')}")
-
-        display_col, control_col = st.columns([2, 1])
-
-        with display_col:
-            display_img = processed if processed else img
-            st.image(display_img, width="stretch")
-
-        with control_col:
-            # --- 微修正 ---
-            st.markdown("**✏️ 微修正**")
-            refine_text = st.text_area(
-                "修正指示",
-                placeholder="例: 人物をもう少し大きく、背景の色をもう少し明るく",
-                height=80,
-                key=f"mv_refine_text_{i}",
-            )
-            if st.button("微修正して再生成", key=f"mv_refine_btn_{i}", disabled=not refine_text.strip()):
-                with st.spinner("微修正中..."):
-                    try:
-                        ok, text = refine_mv_image(
-                            i, refine_text, config,
-                            site_name=st.session_state.current_site,
-                        )
-                        if ok:
-                            st.success("微修正完了!")
-                        else:
-                            st.warning(f"微修正に失敗: {text or ''}")
-                    except Exception as e:
-                        st.error(f"微修正エラー: {e}")
-                st.rerun()
-
-            # --- 再生成 ---
-            st.divider()
-            if st.button("同じ案で再生成", key=f"mv_regen_btn_{i}", use_container_width=True):
-                with st.spinner("再生成中..."):
-                    try:
-                        ok, text = generate_mv_image(
-                            mv_proposal, entry["proposal_idx"], config,
-                            st.session_state.get("mv_gen_aspect_ratio", "16:9"),
-                            st.session_state.get("mv_gen_image_size", "2K"),
-                            site_name=st.session_state.current_site,
+    # --- 一括微修正: 修正指示が入力されている全エントリを並列でrefineする ---
+    refine_targets = [
+        (i, st.session_state.get(f"mv_refine_text_{i}", "").strip())
+        for i in range(len(mv_images))
+    ]
+    refine_targets = [(i, txt) for i, txt in refine_targets if txt]
+    if st.button(
+        f"修正指示のある{len(refine_targets)}件を一括微修正",
+        disabled=not refine_targets,
+        key="mv_refine_bulk",
+    ):
+        image_client = _get_image_client_cached(
+            st.session_state.image_provider,
+            st.session_state.api_key,
+            st.session_state.openai_api_key,
+        )
+        mv_ref_images = _get_preset_data(config, st.session_state.current_site)["mv_ref_images"]
+        with st.status(f"{len(refine_targets)}件を並列微修正中...", expanded=True) as status:
+
+            async def _run_refines():
+                sem = asyncio.Semaphore(4)
+
+                async def _one(i, txt):
+                    entry = mv_images[i]
+                    # 指示文組み立てとPILアクセスはイベントループ（メインスレッド）側
+                    current_img = entry.get("processed_image") or _entry_pil(entry)
+                    instruction = _build_refine_instruction(entry, txt)
+                    async with sem:
+                        return i, await asyncio.to_thread(
+                            image_client.refine_image,
+                            current_image=current_img,
+                            instruction=instruction,
+                            reference_images=mv_ref_images or None,
                         )
-                        if ok:
-                            st.success("再生成完了!")
-                        else:
-                            st.warning(f"再生成に失敗: {text or ''}")
-                    except Exception as e:
-                        st.error(f"再生成エラー: {e}")
-                st.rerun()
-
-            # --- 後処理 ---
-            st.divider()
-            st.markdown("**後処理**")
-
-            # トリミング
-            if st.button("余白トリミング", key=f"mv_trim_{i}"):
-                trimmed = trim_whitespace(img)
-                entry["processed_image"] = trimmed
-                st.rerun()
 
-            # リサイズ
-            current_img = processed if processed else img
-            cur_w, cur_h = current_img.size
-            st.caption(f"現在: {cur_w}×{cur_h}px")
-
-            mv_size = config.get("image_sizes", {}).get("mv", {"width": 1200, "height": 630})
-            resize_c1, resize_c2 = st.columns(2)
-            with resize_c1:
-                target_w = st.number_input(
-                    "幅(px)", value=mv_size.get("width", 1200), min_value=100, max_value=4096,
-                    key=f"mv_resize_w_{i}",
+                return await asyncio.gather(
+                    *(_one(i, txt) for i, txt in refine_targets), return_exceptions=True
                 )
-            with resize_c2:
-                target_h = st.number_input(
-                    "高さ(px)", value=mv_size.get("height", 630), min_value=100, max_value=4096,
-                    key=f"mv_resize_h_{i}",
-                )
-            if st.button(f"リサイズ ({target_w}×{target_h})", key=f"mv_resize_{i}"):
-                source = processed if processed else img
-                resized = resize_to_target(source, target_w, target_h)
-                entry["processed_image"] = resized
-                st.rerun()
 
-            # ダウンロード
-            st.divider()
-            download_img = processed if processed else img
-            img_bytes = image_to_bytes(download_img)
-            st.download_button(
-                "この画像をダウンロード",
-                data=img_bytes,
-                file_name=f"mv_image_{entry['proposal_idx']+1}_{i}.png",
-                mime="image/png",
-                key=f"mv_dl_{i}",
-                width="stretch",
-            )
+            failed = 0
+            for result in asyncio.run(_run_refines()):
+                if isinstance(result, Exception):
+                    failed += 1
+                    st.error(f"微修正中にエラー: {result}")
+                    continue
+                i, (gen_image, gen_text) = result
+                if gen_image:
+                    _apply_refine_result(mv_images[i], gen_image, gen_text)
+                    st.write(f"MV案{mv_images[i]['proposal_idx']+1}: 微修正完了")
+                else:
+                    failed += 1
+                    st.warning(f"MV案{mv_images[i]['proposal_idx']+1}: 微修正に失敗 {gen_text or ''}")
+            if failed:
+                status.update(label=f"一括微修正完了（{failed}件失敗）", state="error")
+            else:
+                status.update(label=f"{len(refine_targets)}件の微修正完了!", state="complete")
+        st.rerun()
 
-        st.divider()
+    for i in range(len(mv_images)):
+        _render_result_entry(i, config)